@@ -1,7 +1,10 @@
 import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime
+from collections import defaultdict
 import colorsys
+import os
+import webbrowser
 
 # -------------------------------------------------------------------
 # CONFIG
@@ -33,19 +36,9 @@ def brighten_hsl(h, s, l, amount=DIMMED_L_BOOST):
     return hsl_to_hex(h, s, l)
 
 
-def parse_date(date_str):
-    if pd.isna(date_str):
-        return None
-    date_str = str(date_str).strip()
-    if date_str in ["", "/", "-", "--"]:
-        return None
-    try:
-        return pd.to_datetime(date_str, format="%d/%m/%Y")
-    except:
-        return None
-
-
 def get_gen_color(gen_value, is_dead=False):
+    if is_dead:
+        return "#D3D3D3"
     gen_str = str(gen_value).strip()
     is_prime = gen_str.endswith("'")
     base_str = gen_str.replace("'", "")
@@ -53,13 +46,16 @@ def get_gen_color(gen_value, is_dead=False):
         base_gen = int(base_str)
     except:
         base_gen = 0
-    h, s, l = base_hsl.get(base_gen, (0.45, 0.5, 0.5))
-    color = hsl_to_hex(h, s, l)
-    if is_prime:
-        color = brighten_hsl(h, s, l)
-    if is_dead:
-        return "#D3D3D3"
-    return color
+    return gen_colors[base_gen if base_gen in base_hsl else None, is_prime]
+
+
+# Every living color the palette can produce, keyed by (generation, is_prime);
+# generations outside base_hsl share the None entry
+gen_colors = {
+    (gen, is_prime): brighten_hsl(*hsl) if is_prime else hsl_to_hex(*hsl)
+    for gen, hsl in [*base_hsl.items(), (None, (0.45, 0.5, 0.5))]
+    for is_prime in (False, True)
+}
 
 
 # -------------------------------------------------------------------
@@ -70,67 +66,103 @@ df.columns = df.columns.str.strip().str.replace("\xa0", "", regex=False)
 
 print(df.columns.tolist())
 
-birth_col = [c for c in df.columns if "Naissance" in c][0]
-death_col = [c for c in df.columns if "Deces" in c][0]
-prenom_col = [c for c in df.columns if "Prénom" in c or "Prenom" in c][0]
-nom_col = [c for c in df.columns if c.startswith("Nom")][0]
-gen_col = [c for c in df.columns if c.startswith("Gen")][0]
+col_map = {c.lower(): c for c in df.columns}
+
+
+def find_column(*names, prefix=False):
+    """Exact (case-insensitive) header match first, then a substring match,
+    or a prefix match when the name could also occur inside another header."""
+    for name in names:
+        if name in col_map:
+            return col_map[name]
+    for key, col in col_map.items():
+        if any(key.startswith(n) if prefix else n in key for n in names):
+            return col
+    raise ValueError(f"No {' / '.join(names)} column found in {file_path}")
 
-for col in [birth_col, death_col]:
-    df[col] = df[col].replace(["", " ", "--", "-", "/", "N/A", "NA", "None"], pd.NA)
 
-df["Birth_Date"] = df[birth_col].apply(parse_date)
-df["Death_Date"] = df[death_col].apply(parse_date)
+birth_col = find_column("naissance")
+death_col = find_column("deces")
+prenom_col = find_column("prenom", "prénom")
+nom_col = find_column("nom", prefix=True)  # "nom" is also inside "prenom"
+gen_col = find_column("gen", prefix=True)
 
-df = df[df["Birth_Date"].notna()].copy()
-df = df.sort_values("Birth_Date")
+# Placeholders such as "", "/" or "--" fail the format and become NaT
+for col, date_col in [(birth_col, "Birth_Date"), (death_col, "Death_Date")]:
+    df[date_col] = pd.to_datetime(
+        df[col].str.strip(), format="%d/%m/%Y", errors="coerce"
+    )
+
+df = df.loc[df["Birth_Date"].notna()].sort_values(
+    "Birth_Date", kind="mergesort", ignore_index=True
+)
 
 # -------------------------------------------------------------------
 # CREATE PLOTLY FIGURE
 # -------------------------------------------------------------------
 fig = go.Figure()
-annotations = []
 
-for idx, (_, person) in enumerate(df.iterrows()):
+people = df[["Birth_Date", "Death_Date", gen_col, prenom_col, nom_col]].rename(
+    columns={gen_col: "Gen", prenom_col: "Prenom", nom_col: "Nom"}
+)
+people["Is_Dead"] = people["Death_Date"].notna()
+
+# Lifespan lines are batched into one trace per color, with None breaks
+# between people, and all endpoints share a single marker trace whose
+# birth points also carry the name labels.
+line_segments = defaultdict(lambda: ([], []))
+marker_x, marker_y, marker_colors, marker_text = [], [], [], []
+marker_labels = []
+
+for idx, person in enumerate(people.itertuples(index=False, name="Person")):
     y = idx * VERTICAL_SPACING
-    birth = person["Birth_Date"]
-    death = person["Death_Date"]
-    is_dead = pd.notna(death)
+    birth = person.Birth_Date
+    death = person.Death_Date
+    is_dead = person.Is_Dead
     bar_end = death if is_dead else datetime.now()
 
-    gen_value = person[gen_col]
-    line_color = get_gen_color(gen_value, is_dead=is_dead)
-    marker_color = get_gen_color(gen_value, is_dead=False)
+    line_color = get_gen_color(person.Gen, is_dead=is_dead)
+    marker_color = get_gen_color(person.Gen, is_dead=False)
 
-    prenom = person[prenom_col]
-    nom = person[nom_col]
-    full_name = f"{prenom} {nom}"
+    full_name = f"{person.Prenom} {person.Nom}"
 
     # Lifespan line
+    seg_x, seg_y = line_segments[line_color]
+    seg_x += [birth, bar_end, None]
+    seg_y += [y, y, None]
+
+    marker_x += [birth, bar_end]
+    marker_y += [y, y]
+    marker_colors += [marker_color, marker_color]
+    marker_text += [full_name, full_name]
+    marker_labels += [full_name, ""]
+
+for line_color, (seg_x, seg_y) in line_segments.items():
     fig.add_trace(
-        go.Scatter(
-            x=[birth, bar_end],
-            y=[y, y],
-            mode="lines+markers",
+        go.Scattergl(
+            x=seg_x,
+            y=seg_y,
+            mode="lines",
             line=dict(color=line_color, width=2),
-            marker=dict(color="white", line=dict(color=marker_color, width=1), size=6),
-            hovertext=full_name,
-            hoverinfo="text",
+            hoverinfo="skip",
             showlegend=False,
         )
     )
 
-    # Name annotation
-    annotations.append(
-        dict(
-            x=birth.replace(year=birth.year - 1),
-            y=y,
-            xanchor="right",
-            text=full_name,
-            font=dict(color="lightgrey", size=6),
-            showarrow=False,
-        )
+fig.add_trace(
+    go.Scattergl(
+        x=marker_x,
+        y=marker_y,
+        mode="markers+text",
+        marker=dict(color="white", line=dict(color=marker_colors, width=1), size=6),
+        text=marker_labels,
+        textposition="middle left",
+        textfont=dict(color="lightgrey", size=6),
+        hovertext=marker_text,
+        hoverinfo="text",
+        showlegend=False,
     )
+)
 
 # -------------------------------------------------------------------
 # LAYOUT
@@ -155,7 +187,6 @@ fig.update_layout(
         linewidth=2,
         mirror=True,
     ),
-    annotations=annotations,
     margin=dict(l=50, r=50, t=50, b=50),
     legend=dict(x=0, y=1, traceorder="normal", xanchor="left", yanchor="top"),
     height=VERTICAL_SPACING * len(df) * 15,
@@ -184,4 +215,24 @@ fig.add_trace(
     )
 )
 
-fig.show()
+# -------------------------------------------------------------------
+# EXPORT HTML
+# -------------------------------------------------------------------
+# Written straight to a file rather than going through the fig.show() renderer
+output_html = "family_timeline.html"
+
+fig.write_html(
+    output_html,
+    include_plotlyjs="cdn",
+    full_html=True,
+    validate=False,  # traces were validated when the figure was built
+)
+
+# -------------------------------------------------------------------
+# OPEN AUTOMATICALLY
+# -------------------------------------------------------------------
+html_path = os.path.abspath(output_html)
+
+print(f"✓ Timeline generated correctly:\n{html_path}")
+
+webbrowser.open(f"file://{html_path}")
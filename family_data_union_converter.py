@@ -1,7 +1,10 @@
 import pandas as pd
+import numpy as np
 import unicodedata
+from functools import lru_cache
 import os
 import re
+from itertools import chain
 
 # -----------------------------
 # Load CSV automatically
@@ -18,44 +21,39 @@ df = pd.read_csv(file_path, sep=";", encoding="cp1252", dtype=str)
 # -----------------------------
 # Normalize column names
 # -----------------------------
+# Deletion table for the combining diacritical marks left by NFD
+STRIP_ACCENTS = str.maketrans("", "", "".join(chr(c) for c in range(0x300, 0x370)))
+
+
+@lru_cache(maxsize=None)
 def normalize(name):
     name = str(name).strip().replace("\xa0", "")
-    return "".join(
-        c for c in unicodedata.normalize("NFD", name) if unicodedata.category(c) != "Mn"
-    )
+    if name.isascii():  # nothing to decompose
+        return name
+    return unicodedata.normalize("NFD", name).translate(STRIP_ACCENTS)
 
 
 df.columns = [normalize(c) for c in df.columns]
 
 # -----------------------------
-# Clean ID columns
+# Keep original parent IDs
 # -----------------------------
-ID_COLS = ["ID", "ID_pere", "ID_mere", "ID_Conjoint"]
-
-for col in ID_COLS:
-    if col in df.columns:
-        df[col] = (
-            df[col].astype(str).str.strip().replace({"/": None, "?": None, "nan": None})
-        )
+# Trimmed, with placeholders blanked; a prime here marks a non-biological parent
+for col in ["ID_pere", "ID_mere"]:
+    df[f"{col}_original"] = (
+        df[col].str.strip().replace({"/": None, "?": None, "nan": None})
+    )
 
 # -----------------------------
-# Keep original parent IDs
+# Clean ID columns
 # -----------------------------
-df["ID_pere_original"] = df.get("ID_pere", "").copy()
-df["ID_mere_original"] = df.get("ID_mere", "").copy()
-
-
-# Extract digits only for tree construction
-def digits_only_series(s):
-    s = s.fillna("").astype(str).str.strip()
-    digits = s.str.extract(r"(\d+)")[0]
-    return pd.to_numeric(digits, errors="coerce")
-
+# Digits only for tree construction; placeholders have none and become NaN
+ID_COLS = ["ID", "ID_pere", "ID_mere", "ID_Conjoint"]
 
-df["ID_pere"] = digits_only_series(df["ID_pere"])
-df["ID_mere"] = digits_only_series(df["ID_mere"])
-df["ID_Conjoint"] = digits_only_series(df["ID_Conjoint"])
-df["ID"] = digits_only_series(df["ID"])
+for col in ID_COLS:
+    df[col] = pd.to_numeric(
+        df[col].str.extract(r"(\d+)", expand=False), errors="coerce"
+    )
 
 # Ensure Note exists
 if "Note" not in df.columns:
@@ -66,51 +64,61 @@ if "Note" not in df.columns:
 # Helpers
 # -----------------------------
 def is_valid(x):
-    return x is not None and not pd.isna(x)
+    return x is not None and x == x  # NaN is the only value unequal to itself
+
 
+def sorted_pairs(col_a, col_b):
+    """Rows where both IDs are known, with each pair as (low, high) ints."""
+    a, b = df[col_a].to_numpy(dtype=float), df[col_b].to_numpy(dtype=float)
+    rows = np.flatnonzero(~(np.isnan(a) | np.isnan(b)))
+    a, b = a[rows], b[rows]
+    return rows, np.minimum(a, b).astype(np.int64), np.maximum(a, b).astype(np.int64)
 
-people = {int(row["ID"]): row for _, row in df.iterrows() if is_valid(row.get("ID"))}
+
+# Every row as a plain dict, built once; emitted rows are shallow copies
+records = [dict(zip(df.columns, values)) for values in df.itertuples(index=False)]
+
+people = {int(row["ID"]): row for row in records if is_valid(row["ID"])}
 
 # -----------------------------
 # Detect unions
 # -----------------------------
+parent_rows, parent_lo, parent_hi = sorted_pairs("ID_pere", "ID_mere")
+_, spouse_lo, spouse_hi = sorted_pairs("ID", "ID_Conjoint")
+
 union_map = {}
 union_counter = 1
 
-# From children (two parents)
-for _, row in df.iterrows():
-    p = row.get("ID_pere")
-    m = row.get("ID_mere")
-    if is_valid(p) and is_valid(m):
-        key = tuple(sorted([int(p), int(m)]))
-        if key not in union_map:
-            union_map[key] = f"U{union_counter}"
-            union_counter += 1
-
-# From explicit spouses
-for _, row in df.iterrows():
-    pid = row.get("ID")
-    cid = row.get("ID_Conjoint")
-    if is_valid(pid) and is_valid(cid):
-        key = tuple(sorted([int(pid), int(cid)]))
-        if key not in union_map:
-            union_map[key] = f"U{union_counter}"
-            union_counter += 1
+# From children (two parents), then from explicit spouses
+for key in chain(
+    zip(parent_lo.tolist(), parent_hi.tolist()),
+    zip(spouse_lo.tolist(), spouse_hi.tolist()),
+):
+    if key not in union_map:
+        union_map[key] = f"U{union_counter}"
+        union_counter += 1
 
 # -----------------------------
 # Expand table
 # -----------------------------
 expanded_cols = list(df.columns) + ["Union_ID", "Role", "Remark"]
-rows = []
+# Output is accumulated column-wise (one list per distinct column name)
+columns = {col: [] for col in expanded_cols}
+
 
+def emit(row):
+    for col, values in columns.items():
+        values.append(row.get(col))
 
-def get_children(p1, p2):
-    """Return children with digit-only parent IDs"""
-    return df[
-        ((df["ID_pere"] == p1) & (df["ID_mere"] == p2))
-        | ((df["ID_pere"] == p2) & (df["ID_mere"] == p1))
-    ]
 
+# Children grouped once by their sorted parent pair (low * PAIR_BASE + high),
+# in row order
+PAIR_BASE = 10**9
+pair_keys = pd.Series(parent_lo * PAIR_BASE + parent_hi, index=parent_rows)
+children_groups = {
+    key: [records[i] for i in rows]
+    for key, rows in pair_keys.groupby(pair_keys).groups.items()
+}
 
 for (p1, p2), union_id in union_map.items():
     p1 = int(p1)
@@ -131,34 +139,34 @@ for (p1, p2), union_id in union_map.items():
     union_status = "current_union" if is_current else "former_union"
 
     # Children
-    children = get_children(p1, p2)
+    children = children_groups.get(p1 * PAIR_BASE + p2, [])  # p1 < p2
 
     # --- Parents ---
     for pid, spouse_id in [(p1, p2), (p2, p1)]:
         parent = people.get(pid)
         if parent is None:
             continue
-        r = parent.to_dict()
+        r = parent.copy()
         r["ID_Conjoint"] = spouse_id
         r["Union_ID"] = union_id
         r["Role"] = "parent"
         r["Remark"] = union_status if len(children) else "union_no_children"
-        rows.append(r)
+        emit(r)
 
     # --- Children ---
-    for _, child in children.iterrows():
-        c = child.to_dict()
+    for child in children:
+        c = child.copy()
         c["Union_ID"] = union_id
         c["Role"] = "child"
         c["Remark"] = "child"
-        rows.append(c)
+        emit(c)
 
 # -----------------------------
 # Single-parent unions
 # -----------------------------
 single_union_counter = 10000
 
-for _, row in df.iterrows():
+for row in records:
     cid = row.get("ID")
     if not is_valid(cid):
         continue
@@ -180,43 +188,44 @@ for _, row in df.iterrows():
     # --- Parent row ---
     parent = people.get(parent_id)
     if parent is not None:
-        r = parent.to_dict()
+        r = parent.copy()
         r["Union_ID"] = union_id
         r["Role"] = "parent"
         r["Remark"] = "single_parent"
         r["ID_Conjoint"] = None
-        rows.append(r)
+        emit(r)
 
     # --- Child row ---
-    c = row.to_dict()
+    c = row.copy()
     c["Union_ID"] = union_id
     c["Role"] = "child"
     c["Remark"] = "single_parent"
-    rows.append(c)
+    emit(c)
 
 # -----------------------------
 # Singles
 # -----------------------------
-used_ids = {int(r["ID"]) for r in rows if is_valid(r.get("ID"))}
+used_ids = {int(pid) for pid in columns["ID"] if is_valid(pid)}
 
-for _, row in df.iterrows():
+for row in records:
     pid = row.get("ID")
     if not is_valid(pid) or int(pid) in used_ids:
         continue
 
-    r = row.to_dict()
+    r = row.copy()
     remark = (
         "no_parents"
         if not is_valid(row.get("ID_pere")) and not is_valid(row.get("ID_mere"))
         else "single_parent"
     )
     r.update({"Union_ID": "", "Role": "single", "Remark": remark})
-    rows.append(r)
+    emit(r)
 
 # -----------------------------
 # Finalize dataframe
 # -----------------------------
-df_expanded = pd.DataFrame(rows, columns=expanded_cols).drop_duplicates()
+# Re-selecting expanded_cols restores the repeated Union_ID/Role headers
+df_expanded = pd.DataFrame(columns)[expanded_cols].drop_duplicates()
 
 # -----------------------------
 # Gen / Gen_Origin
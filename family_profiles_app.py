@@ -19,6 +19,19 @@ def clean_id(x):
     return str(x).replace(".0", "").strip()
 
 
+# ============================================================
+# ROW ACCESS (itertuples rows are plain tuples)
+# ============================================================
+
+
+def column_positions(frame):
+    return {c: i for i, c in enumerate(frame.columns)}
+
+
+def field(row, cols, name, default=""):
+    return row[cols[name]] if name in cols else default
+
+
 # ============================================================
 # LOAD DATA
 # ============================================================
@@ -58,24 +71,27 @@ visible_df = people_df[people_df["GEN_CLEAN"].isin([0, 1])]
 # ============================================================
 
 people = {}
+cols = column_positions(people_df)
 
-for _, row in people_df.iterrows():
-    pid = clean_id(row["ID"])
+for row in people_df.itertuples(index=False, name=None):
+    pid = clean_id(row[cols["ID"]])
+    prenom = field(row, cols, "Prenom")
+    nom = field(row, cols, "Nom")
 
     people[pid] = {
         "id": pid,
-        "prenom": row.get("Prenom", ""),
-        "nom": row.get("Nom", ""),
-        "name": f"{row.get('Prenom', '')} {row.get('Nom', '')}".strip(),
-        "birth": row.get("Naissance", ""),
-        "death": row.get("Deces", ""),
-        "gen": row.get("Gen", ""),
-        "gen_origin": row.get("Gen_Origin", ""),
-        "father_id": clean_id(row.get("ID_pere", "")),
-        "mother_id": clean_id(row.get("ID_mere", "")),
-        "spouse_id": clean_id(row.get("ID_Conjoint", "")),
-        "note": row.get("Note", ""),  # ✅ ADDED HERE
-        "remark": row.get("Remark", ""),
+        "prenom": prenom,
+        "nom": nom,
+        "name": f"{prenom} {nom}".strip(),
+        "birth": field(row, cols, "Naissance"),
+        "death": field(row, cols, "Deces"),
+        "gen": field(row, cols, "Gen"),
+        "gen_origin": field(row, cols, "Gen_Origin"),
+        "father_id": clean_id(field(row, cols, "ID_pere")),
+        "mother_id": clean_id(field(row, cols, "ID_mere")),
+        "spouse_id": clean_id(field(row, cols, "ID_Conjoint")),
+        "note": field(row, cols, "Note"),  # ✅ ADDED HERE
+        "remark": field(row, cols, "Remark"),
     }
 
 
@@ -95,9 +111,12 @@ app = Dash(__name__)
 
 person_options = []
 
-for _, row in visible_df.sort_values(["GEN_CLEAN", "Nom", "Prenom"]).iterrows():
-    pid = clean_id(row["ID"])
-    label = f"Gen {row['GEN_CLEAN']} — {row['Prenom']} {row['Nom']}"
+for row in visible_df.sort_values(["GEN_CLEAN", "Nom", "Prenom"]).itertuples(
+    index=False, name=None
+):
+    pid = clean_id(row[cols["ID"]])
+    gen, prenom, nom = row[cols["GEN_CLEAN"]], row[cols["Prenom"]], row[cols["Nom"]]
+    label = f"Gen {gen} — {prenom} {nom}"
 
     person_options.append({"label": label, "value": pid})
 
@@ -188,23 +207,24 @@ def update_profile(person_id):
     # ========================================================
 
     children_rows = []
+    cols = column_positions(df)
 
-    for _, row in df.iterrows():
+    for row in df.itertuples(index=False, name=None):
 
-        remark = str(row.get("Remark", "")).lower().strip()
+        remark = str(field(row, cols, "Remark")).lower().strip()
         if "child" not in remark:
             continue
 
-        father_id = clean_id(row.get("ID_pere", ""))
-        mother_id = clean_id(row.get("ID_mere", ""))
+        father_id = clean_id(field(row, cols, "ID_pere"))
+        mother_id = clean_id(field(row, cols, "ID_mere"))
 
         if father_id != person_id and mother_id != person_id:
             continue
 
-        child_name = (
-            f"{row.get('Prenom','').strip()} {row.get('Nom','').strip()}".strip()
-        )
-        birth = row.get("Naissance", "").strip()
+        prenom = field(row, cols, "Prenom").strip()
+        nom = field(row, cols, "Nom").strip()
+        child_name = f"{prenom} {nom}".strip()
+        birth = field(row, cols, "Naissance").strip()
 
         other_parent_id = mother_id if father_id == person_id else father_id
         other_parent_name = get_person_name(other_parent_id)
@@ -2,8 +2,6 @@ import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import colorsys
-import random
-from collections import defaultdict
 import numpy as np
 import os
 import webbrowser
@@ -13,6 +11,8 @@ import webbrowser
 # -------------------------------------------------------------------
 FILE_PATH = "family_data.csv"
 REFERENCE_YEAR = 2000
+YEAR_START = datetime(REFERENCE_YEAR, 1, 1)
+YEAR_END = datetime(REFERENCE_YEAR, 12, 31)
 
 LANE_HEIGHTS_ABOVE = [0.2, 0.6, 1.0, 1.4]
 LANE_HEIGHTS_BELOW = LANE_HEIGHTS_ABOVE
@@ -20,6 +20,7 @@ OFFSET_AMOUNT = 0.15
 GESTATION_DAYS = 274  # ~9 months
 
 BINS = 12
+SCATTERGL_MIN_ROWS = 1000  # WebGL only pays off for large families
 
 BASE_HSL = {
     0: (0.58, 0.55, 0.40),
@@ -50,39 +51,54 @@ def get_gen_color(gen_value):
         base_gen = int(base_str)
     except:
         base_gen = 0
-    h, s, l = BASE_HSL.get(base_gen, (0.45, 0.5, 0.5))
-    return brighten_hsl(h, s, l) if is_prime else hsl_to_hex(h, s, l)
+    return GEN_COLORS[base_gen if base_gen in BASE_HSL else None, is_prime]
 
 
-# -------------------------------------------------------------------
-# DATE PARSING
-# -------------------------------------------------------------------
-def parse_date(value):
-    if pd.isna(value):
-        return None
-    value = str(value).strip()
-    if value in ["", "-", "--", "/", "NA", "N/A"]:
-        return None
-    try:
-        return pd.to_datetime(value, format="%d/%m/%Y")
-    except:
-        return None
+# Every color the palette can produce, keyed by (generation, is_prime);
+# generations outside BASE_HSL share the None entry
+GEN_COLORS = {
+    (gen, is_prime): brighten_hsl(*hsl) if is_prime else hsl_to_hex(*hsl)
+    for gen, hsl in [*BASE_HSL.items(), (None, (0.45, 0.5, 0.5))]
+    for is_prime in (False, True)
+}
 
 
 # -------------------------------------------------------------------
 # LOAD DATA
 # -------------------------------------------------------------------
-df = pd.read_csv(FILE_PATH, sep=";", encoding="cp1252", dtype=str)
+# Header-only pass to locate the four columns used, then parse just those
+header = pd.read_csv(FILE_PATH, sep=";", encoding="cp1252", nrows=0).columns
+columns = header.str.strip().str.replace("\xa0", "", regex=False)
+
+birth_col = next(c for c in columns if "Naissance" in c)
+prenom_col = next(c for c in columns if "Prénom" in c or "Prenom" in c)
+nom_col = next(c for c in columns if c.startswith("Nom"))
+gen_col = next(c for c in columns if c.startswith("Gen"))
+
+used = [birth_col, prenom_col, nom_col, gen_col]
+df = pd.read_csv(
+    FILE_PATH,
+    sep=";",
+    encoding="cp1252",
+    dtype=str,
+    usecols=[raw for raw, col in zip(header, columns) if col in used],
+)
 df.columns = df.columns.str.strip().str.replace("\xa0", "", regex=False)
 
-birth_col = next(c for c in df.columns if "Naissance" in c)
-prenom_col = next(c for c in df.columns if "Prénom" in c or "Prenom" in c)
-nom_col = next(c for c in df.columns if c.startswith("Nom"))
-gen_col = next(c for c in df.columns if c.startswith("Gen"))
-
-df["Birth_Date"] = df[birth_col].apply(parse_date)
+# Placeholders such as "", "/" or "--" fail the format and become NaT
+df["Birth_Date"] = pd.to_datetime(
+    df[birth_col].str.strip(), format="%d/%m/%Y", errors="coerce"
+)
 df = df[df["Birth_Date"].notna()].copy()
-df["Calendar_Date"] = df["Birth_Date"].apply(lambda d: d.replace(year=REFERENCE_YEAR))
+df["Calendar_Date"] = pd.to_datetime(
+    pd.DataFrame(
+        {
+            "year": REFERENCE_YEAR,
+            "month": df["Birth_Date"].dt.month,
+            "day": df["Birth_Date"].dt.day,
+        }
+    )
+)
 df = df.sort_values("Calendar_Date").reset_index(drop=True)
 df["day_of_year"] = df["Calendar_Date"].dt.dayofyear
 
@@ -90,39 +106,40 @@ df["day_of_year"] = df["Calendar_Date"].dt.dayofyear
 # -------------------------------------------------------------------
 # HISTOGRAM FUNCTION (no wrapping)
 # -------------------------------------------------------------------
-def simple_hist(days, bins=BINS, max_height=1.7):
-    hist, bin_edges = np.histogram(days, bins=bins, range=(0, 365))
-    hist = hist / hist.max() * max_height
-    # bin centers
-    bin_centers = [
-        (bin_edges[i] + bin_edges[i + 1]) / 2 for i in range(len(bin_edges) - 1)
-    ]
-    bin_dates = [
-        datetime(REFERENCE_YEAR, 1, 1) + timedelta(days=int(d)) for d in bin_centers
-    ]
-    return hist, bin_dates
+# Bin edges and their dates are shared by both distributions
+BIN_EDGES = np.linspace(0, 365, BINS + 1)
+# bin centers, truncated to whole days from January 1st
+BIN_DAYS = ((BIN_EDGES[:-1] + BIN_EDGES[1:]) / 2).astype("timedelta64[D]")
+BIN_DATES = np.datetime64(YEAR_START) + BIN_DAYS
+
+
+def simple_hist(days, max_height=1.7):
+    hist, _ = np.histogram(days, bins=BIN_EDGES)
+    return hist / hist.max() * max_height
 
 
 # Birthday distribution
-birthday_hist, birthday_dates = simple_hist(
-    df["day_of_year"], bins=BINS, max_height=max(LANE_HEIGHTS_ABOVE)
-)
+birthday_hist = simple_hist(df["day_of_year"], max_height=max(LANE_HEIGHTS_ABOVE))
 
 # Conception distribution (shifted by 9 months)
 concept_day_of_year = (df["day_of_year"] - GESTATION_DAYS) % 365
-concept_hist, concept_dates = simple_hist(
-    concept_day_of_year, bins=BINS, max_height=max(LANE_HEIGHTS_ABOVE)
-)
+concept_hist = simple_hist(concept_day_of_year, max_height=max(LANE_HEIGHTS_ABOVE))
 
 # -------------------------------------------------------------------
 # FIGURE INIT
 # -------------------------------------------------------------------
-fig = go.Figure()
+# Traces are collected here and handed to the figure in one go, instead of
+# re-validating the growing trace tuple on every add_trace
+traces = []
+
+# Stems and dots switch to WebGL for large families; the histogram fills
+# below stay SVG since Scattergl does not support tozeroy fills well
+PointTrace = go.Scattergl if len(df) >= SCATTERGL_MIN_ROWS else go.Scatter
 
 # Birthday distribution
-fig.add_trace(
+traces.append(
     go.Scatter(
-        x=birthday_dates,
+        x=BIN_DATES,
         y=birthday_hist,
         fill="tozeroy",  # fill from zero
         fillcolor="rgba(150,200,255,0.3)",
@@ -133,9 +150,9 @@ fig.add_trace(
 )
 
 # Conception distribution (shifted by 9 months)
-fig.add_trace(
+traces.append(
     go.Scatter(
-        x=concept_dates,
+        x=BIN_DATES,
         y=concept_hist,
         fill="tozeroy",  # fill from zero
         fillcolor="rgba(255,150,150,0.3)",
@@ -148,43 +165,57 @@ fig.add_trace(
 # -------------------------------------------------------------------
 # SAME-DAY BIRTHDAYS OFFSET
 # -------------------------------------------------------------------
-same_day_counts = defaultdict(int)
-
-
-def get_x_offset(date):
-    count = same_day_counts[date]
-    same_day_counts[date] += 1
-    shift = 0.8 * ((count % 2) * 2 - 1)
-    return timedelta(days=shift)
-
+# Successive births on the same day alternate 0.8 day left and right
+# (0.8 day is exactly 1152 minutes, so the shift stays integral)
+same_day_count = df.groupby("Calendar_Date").cumcount().to_numpy()
+x_shifts = ((same_day_count & 1) * 2 - 1) * np.timedelta64(1152, "m")
+plot_x = df["Calendar_Date"] + x_shifts
 
 # -------------------------------------------------------------------
 # STEMS, DOTS, LABELS
 # -------------------------------------------------------------------
-for idx, person in df.iterrows():
-    base_x = person["Calendar_Date"]
-    x_shift = get_x_offset(base_x)
-    x = base_x + x_shift
-
-    direction = 1 if idx % 2 == 0 else -1
-    lane_idx = (idx // 2) % 4
-    base_y = (
-        LANE_HEIGHTS_ABOVE[lane_idx] if direction > 0 else LANE_HEIGHTS_BELOW[lane_idx]
-    )
-
-    offset = random.uniform(-OFFSET_AMOUNT, OFFSET_AMOUNT)
-    y = direction * (base_y + offset)
-
-    color = get_gen_color(person[gen_col])
-    full_name = f"{person[prenom_col]} {person[nom_col]}"
-    date_label = base_x.strftime("%d %B")
-    hover_text = f"<b>{full_name}</b><br>{date_label}"
-
-    # Stem
-    fig.add_trace(
-        go.Scatter(
-            x=[x, x],
-            y=[0, y],
+# Stems are batched into one trace per color, with None breaks between
+# people; all dots share a single marker trace and all names a text trace.
+# People alternate above/below the baseline and cycle through the lanes,
+# with a random jitter so neighbouring labels do not line up
+row = np.arange(len(df))
+direction = 1 - 2 * (row % 2)
+lane_idx = (row // 2) % len(LANE_HEIGHTS_ABOVE)
+base_y = np.where(
+    direction > 0,
+    np.asarray(LANE_HEIGHTS_ABOVE)[lane_idx],
+    np.asarray(LANE_HEIGHTS_BELOW)[lane_idx],
+)
+rng = np.random.default_rng(0)
+offsets = rng.uniform(-OFFSET_AMOUNT, OFFSET_AMOUNT, size=len(df))
+y_values = direction * (base_y + offsets)
+gen_color_map = {g: get_gen_color(g) for g in df[gen_col].unique()}
+colors = df[gen_col].map(gen_color_map).to_numpy()
+
+full_names = df[prenom_col].fillna("") + " " + df[nom_col].fillna("")
+date_labels = df["Calendar_Date"].dt.strftime("%d %B")
+hover_texts = "<b>" + full_names + "</b><br>" + date_labels
+
+# Labels are nudged away from the baseline
+above = y_values > 0
+label_y = np.where(above, y_values + 0.05, y_values - 0.05)
+label_position = np.where(above, "top center", "bottom center")
+
+
+def none_separated(starts, ends):
+    """Interleave segment endpoints as [s0, e0, None, s1, e1, None, ...]."""
+    points = np.empty(3 * len(starts), dtype=object)
+    points[0::3], points[1::3] = starts, ends
+    return points.tolist()
+
+
+# Stems: each segment is [x, x, None] / [0, y, None]
+for color in pd.unique(colors):
+    mask = colors == color
+    traces.append(
+        PointTrace(
+            x=none_separated(plot_x[mask], plot_x[mask]),
+            y=none_separated(np.zeros(mask.sum()), y_values[mask]),
             mode="lines",
             line=dict(color=color, width=2),
             hoverinfo="skip",
@@ -192,38 +223,40 @@ for idx, person in df.iterrows():
         )
     )
 
-    # Dot
-    fig.add_trace(
-        go.Scatter(
-            x=[x],
-            y=[y],
-            mode="markers",
-            marker=dict(size=7, color="white", line=dict(color=color, width=1.5)),
-            hovertext=hover_text,
-            hoverinfo="text",
-            showlegend=False,
-        )
+traces.append(
+    PointTrace(
+        x=plot_x,
+        y=y_values,
+        mode="markers",
+        marker=dict(size=7, color="white", line=dict(color=colors, width=1.5)),
+        hovertext=hover_texts,
+        hoverinfo="text",
+        showlegend=False,
     )
+)
 
-    # Label
-    fig.add_annotation(
-        x=x,
-        y=y,
-        text=full_name,
-        xanchor="center",
-        yanchor="bottom" if y > 0 else "top",
-        yshift=6 if y > 0 else -6,
-        font=dict(size=12, color="black"),
-        showarrow=False,
+traces.append(
+    PointTrace(
+        x=plot_x,
+        y=label_y,
+        mode="text",
+        text=full_names,
+        textposition=label_position,
+        textfont=dict(size=12, color="black"),
+        hoverinfo="skip",
+        showlegend=False,
     )
+)
+
+fig = go.Figure(data=traces)
 
 # -------------------------------------------------------------------
 # BASE LINE
 # -------------------------------------------------------------------
 fig.add_shape(
     type="line",
-    x0=datetime(REFERENCE_YEAR, 1, 1),
-    x1=datetime(REFERENCE_YEAR, 12, 31),
+    x0=YEAR_START,
+    x1=YEAR_END,
     y0=0,
     y1=0,
     line=dict(color="black", width=2),
@@ -232,8 +265,8 @@ fig.add_shape(
 # -------------------------------------------------------------------
 # LAYOUT
 # -------------------------------------------------------------------
-x_min = datetime(REFERENCE_YEAR, 1, 1) - timedelta(days=10)
-x_max = datetime(REFERENCE_YEAR, 12, 31) + timedelta(days=10)
+x_min = YEAR_START - timedelta(days=10)
+x_max = YEAR_END + timedelta(days=10)
 max_h = max(LANE_HEIGHTS_ABOVE + LANE_HEIGHTS_BELOW) + 0.4
 
 fig.update_layout(
@@ -269,6 +302,7 @@ fig.write_html(
     output_html,
     include_plotlyjs="cdn",
     full_html=True,
+    validate=False,  # traces were validated when the figure was built
 )
 
 # -------------------------------------------------------------------
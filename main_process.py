@@ -1,128 +1,249 @@
 import pandas as pd
-import json
+import re
+import sys
 import unicodedata
+from functools import lru_cache
 import subprocess
 import webbrowser
+from collections import defaultdict
 
-subprocess.run(["python", "family_data_union_converter.py"], check=True)
+# Use orjson's native serializer when it is installed
+try:
+    import orjson
 
-df = pd.read_csv(
-    "family_data_roles_union.csv", sep=";", encoding="utf-8-sig", dtype=str
-)
+    def to_json(obj):
+        return orjson.dumps(obj).decode("utf-8")
 
-# -----------------------------
-# Load CSV
-# -----------------------------
-df = pd.read_csv(
-    "family_data_roles_union.csv", sep=";", encoding="utf-8-sig", dtype=str
-)
+except ImportError:
+    import json
+
+    def to_json(obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+subprocess.run(["python", "family_data_union_converter.py"], check=True)
 
 
 # -----------------------------
 # Normalize column names
 # -----------------------------
+# Deletion table for the combining diacritical marks left by NFD
+STRIP_ACCENTS = str.maketrans("", "", "".join(chr(c) for c in range(0x300, 0x370)))
+
+
+@lru_cache(maxsize=None)
 def normalize(name):
     name = str(name).strip().replace("\xa0", "")
-    return "".join(
-        c for c in unicodedata.normalize("NFD", name) if unicodedata.category(c) != "Mn"
-    )
+    if name.isascii():  # nothing to decompose
+        return name
+    return unicodedata.normalize("NFD", name).translate(STRIP_ACCENTS)
 
 
-df.columns = [normalize(c) for c in df.columns]
-
 # -----------------------------
-# Clean numeric IDs
+# Load CSV
 # -----------------------------
-for col in ["ID", "ID_pere", "ID_mere", "ID_Conjoint"]:
-    if col in df.columns:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
+# IDs are parsed straight to nullable integers and the low-cardinality
+# Role/Remark columns to categories; every other column stays str
+ID_COLS = ["ID", "ID_pere", "ID_mere", "ID_Conjoint"]
+CSV_DTYPES = defaultdict(
+    lambda: str,
+    {**{col: "Int64" for col in ID_COLS}, "Role": "category", "Remark": "category"},
+)
+
+# Only the columns the tree needs are parsed
+USED_COLS = set(ID_COLS) | {
+    "Prenom",
+    "Nom",
+    "Naissance",
+    "Deces",
+    "Gen",
+    "Gen_Origin",
+    "Role",
+    "Union_ID",
+    "Remark",
+    "ID_pere_original",
+    "ID_mere_original",
+}
+
+df = pd.read_csv(
+    "family_data_roles_union.csv",
+    sep=";",
+    encoding="utf-8-sig",
+    dtype=CSV_DTYPES,
+    usecols=lambda col: normalize(col) in USED_COLS,
+)
+df.columns = [normalize(c) for c in df.columns]
 
 # -----------------------------
 # Build people registry
 # -----------------------------
 
+
+def column(name, default=""):
+    """Column values as an array, or a constant list if the column is absent."""
+    return df[name].to_numpy() if name in df.columns else [default] * len(df)
+
+
+def text_column(name):
+    """Column as a Series with missing values (or a missing column) as ""."""
+    if name not in df.columns:
+        return pd.Series("", index=df.index)
+    return df[name].fillna("")
+
+
+ids = df["ID"].to_numpy()
+full_names = (text_column("Prenom") + " " + text_column("Nom")).str.strip()
+names = full_names.to_numpy()
+births = text_column("Naissance").to_numpy()
+deaths = text_column("Deces").to_numpy()
+# Few distinct values, shared by every node that carries them
+gen_origins = [sys.intern(g) if isinstance(g, str) else g for g in column("Gen_Origin")]
+gens = (
+    pd.to_numeric(
+        text_column("Gen").str.replace("'", "", regex=False).str.strip(),
+        errors="coerce",
+    )
+    .fillna(0)
+    .astype(int)
+    .to_numpy()
+)
+fathers, mothers = column("ID_pere", None), column("ID_mere", None)
+spouses = column("ID_Conjoint", None)
+union_ids = column("Union_ID", None)
+remarks = column("Remark")
+
+has_id = pd.notna(ids)
+has_father = pd.notna(fathers)
+has_mother = pd.notna(mothers)
+has_spouse = pd.notna(spouses)
+has_union = pd.notna(union_ids)
+is_child = (df["Role"] == "child").to_numpy()
+is_parent = (df["Role"] == "parent").to_numpy()
+
+
+UNION_TYPE_PATTERN = re.compile(r"single_parent|former|union_no_children")
+
+
+def get_union_type(remark):
+    if not isinstance(remark, str):
+        return "current"
+    match = UNION_TYPE_PATTERN.search(remark.lower())
+    return sys.intern(match.group()) if match else "current"
+
+
 people = {}
-for _, row in df.iterrows():
-    if pd.isna(row["ID"]):
+union_index = {}  # (parent_id, union_id) -> that parent's union dict
+for i in range(len(df)):
+    if not has_id[i]:
         continue
 
-    pid = int(row["ID"])
-    people.setdefault(
-        pid,
-        {
+    pid = int(ids[i])
+    if pid not in people:
+        people[pid] = {
             "id": pid,
-            "name": f"{row.get('Prenom','')} {row.get('Nom','')}".strip(),
-            "birth": row.get("Naissance", ""),
-            "death": row.get("Deces", ""),
-            "gen": int(row["Gen"].replace("'", "")) if pd.notna(row.get("Gen")) else 0,
-            "gen_origin": row.get("Gen_Origin", ""),
-            "father_id": int(row["ID_pere"]) if pd.notna(row.get("ID_pere")) else None,
-            "mother_id": int(row["ID_mere"]) if pd.notna(row.get("ID_mere")) else None,
+            "name": names[i],
+            "birth": births[i],
+            "death": deaths[i],
+            "gen": int(gens[i]),
+            "gen_origin": gen_origins[i],
+            "father_id": int(fathers[i]) if has_father[i] else None,
+            "mother_id": int(mothers[i]) if has_mother[i] else None,
             "unions": {},
-        },
-    )
+        }
 
     # Register union ONLY for parents
-    if row.get("Role") == "parent" and pd.notna(row.get("Union_ID")):
-        uid = row["Union_ID"]
-        people[pid]["unions"].setdefault(
-            uid,
-            {
+    if is_parent[i] and has_union[i]:
+        uid = union_ids[i]
+        unions = people[pid]["unions"]
+        if uid not in unions:
+            unions[uid] = union_index[pid, uid] = {
                 "union_id": uid,
-                "spouse_id": (
-                    int(row["ID_Conjoint"])
-                    if pd.notna(row.get("ID_Conjoint"))
-                    else None
-                ),
-                "remark": row.get("Remark", ""),
+                "spouse_id": int(spouses[i]) if has_spouse[i] else None,
+                "remark": remarks[i],
+                "union_type": get_union_type(remarks[i]),
                 "children": [],
-            },
-        )
+            }
 
 # -----------------------------
 # Attach children to unions
 # -----------------------------
-for _, row in df.iterrows():
-    if row.get("Role") != "child":
-        continue
-    if pd.isna(row["ID"]) or pd.isna(row["Union_ID"]):
-        continue
-
-    cid = int(row["ID"])
-    uid = row["Union_ID"]
+# One (child, union, parent) link per known parent, in row order
+child_rows = df.loc[
+    is_child & has_id & has_union,
+    ["ID", "Union_ID", "ID_pere", "ID_mere"],
+]
+parent_links = (
+    child_rows.melt(
+        id_vars=["ID", "Union_ID"],
+        value_vars=["ID_pere", "ID_mere"],
+        value_name="parent_id",
+        ignore_index=False,
+    )
+    .dropna(subset=["parent_id"])
+    .sort_index(kind="stable")
+)
+children_by_union = parent_links.groupby(["parent_id", "Union_ID"], sort=False)
 
-    for parent_col in ["ID_pere", "ID_mere"]:
-        if pd.notna(row.get(parent_col)):
-            pid = int(row[parent_col])
-            if pid in people and uid in people[pid]["unions"]:
-                people[pid]["unions"][uid]["children"].append(cid)
+for (pid, uid), kids in children_by_union["ID"].agg(list).items():
+    union = union_index.get((int(pid), uid))
+    if union is not None:
+        union["children"].extend(int(cid) for cid in kids)
 
 # -----------------------------
 # Detect former-union children
 # -----------------------------
-former_union_children = []
-for cid, child_row in df[df["Role"] == "child"].iterrows():
-    # Count parents who have this child in a union
-    parent_ids = [
-        int(child_row[c]) for c in ["ID_pere", "ID_mere"] if pd.notna(child_row[c])
-    ]
-    if len(parent_ids) == 1:
-        pid = parent_ids[0]
-        name = f"{child_row.get('Prenom','')} {child_row.get('Nom','')}".strip()
-        former_union_children.append((pid, name, int(child_row["ID"])))
+# Children with exactly one known parent, as (parent_id, name, child_id)
+one_parent = has_father != has_mother
+single_parent_rows = df[is_child & one_parent & has_id]
+former_union_children = list(
+    zip(
+        single_parent_rows["ID_pere"]
+        .fillna(single_parent_rows["ID_mere"])
+        .astype(int)
+        .tolist(),
+        full_names[single_parent_rows.index].tolist(),
+        single_parent_rows["ID"].astype(int).tolist(),
+    )
+)
 
 if former_union_children:
     print("⚡ Former-union children to reattach:")
     for pid, name, cid in former_union_children:
         print(f"Parent: {people[pid]['name']} (ID {pid}) → Child: {name}")
 
+
 # -----------------------------
-# Recursive tree builder
+# Non-biological parent flags
+# -----------------------------
+# A prime on the original parent ID marks a non-biological parent.
+# Indexed once by child ID (first row wins) instead of scanning df per child.
+def non_bio_flags(frame, col):
+    if col not in frame.columns:
+        return [False] * len(frame)
+    original = frame[col]
+    return (original.notna() & original.astype(str).str.contains("'")).tolist()
+
+
+first_rows = df.dropna(subset=["ID"]).drop_duplicates(subset=["ID"])
+non_bio_parents = dict(
+    zip(
+        first_rows["ID"].astype(int).tolist(),
+        zip(
+            non_bio_flags(first_rows, "ID_pere_original"),
+            non_bio_flags(first_rows, "ID_mere_original"),
+        ),
+    )
+)
+
+# -----------------------------
+# Tree builder
 # -----------------------------
 visited_global = set()  # global to prevent skipping children
+base_delta = 0.08  # offset for spouse layout
 
 
-def build_node(pid):
+def make_node(pid):
+    """Mark pid as visited and return its base node (None if skipped)."""
     if pid in visited_global:
         return None
     visited_global.add(pid)
@@ -131,8 +252,7 @@ def build_node(pid):
     if not person:
         return None
 
-    # Base node
-    node = {
+    return {
         "id": pid,
         "name": person["name"],
         "birth": person["birth"],
@@ -142,81 +262,108 @@ def build_node(pid):
         "children": [],
     }
 
-    unions = list(person["unions"].values())
-    base_delta = 0.08  # offset for spouse layout
-
-    for i, union in enumerate(unions):
-        remark = (union.get("remark") or "").lower()
-        union_type = (
-            "single_parent"
-            if "single_parent" in remark
-            else (
-                "former"
-                if "former" in remark
-                else "union_no_children" if "union_no_children" in remark else "current"
-            )
-        )
 
-        # --- Build children ---
-        children_nodes = []
-        for cid in union["children"]:
-            child_node = build_node(cid)
+def make_union_node(pid, union, union_type, offset, children_nodes):
+    spouse_id = union.get("spouse_id")
+
+    # Build spouse/union node
+    if spouse_id and spouse_id in people:
+        sp = people[spouse_id]
+        return {
+            "id": f"{pid}_{union['union_id']}",
+            "name": sp["name"],
+            "birth": sp["birth"],
+            "death": sp["death"],
+            "gen": sp["gen"],
+            "gen_origin": sp["gen_origin"],
+            "children": children_nodes,
+            "isSpouse": True,
+            "union_type": union_type,
+            "xOffset": offset,
+        }
+
+    # Single parent union (no spouse)
+    return {
+        "id": f"{pid}_{union['union_id']}",
+        "name": "",
+        "children": children_nodes,
+        "isSpouse": True,
+        "isSingleParent": True,
+        "union_type": union_type,
+        "xOffset": offset,
+    }
+
+
+def new_frame(pid, node):
+    return {
+        "pid": pid,
+        "node": node,
+        "unions": list(people[pid]["unions"].values()),
+        "index": -1,  # current union
+        "pending": iter(()),  # children of the current union still to visit
+        "built": [],  # child nodes of the current union
+        "union_type": None,
+    }
+
+
+def build_node(root_id):
+    """Depth-first build with an explicit stack instead of recursion.
+
+    Children are visited in the same pre-order as a recursive walk, so
+    visited_global decides duplicates exactly as before.
+    """
+    root = make_node(root_id)
+    if root is None:
+        return None
+
+    stack = [new_frame(root_id, root)]
+    while stack:
+        frame = stack[-1]
+
+        # --- Descend into the next child of the current union ---
+        cid = next(frame["pending"], None)
+        if cid is not None:
+            child_node = make_node(cid)
             if child_node:
-                child_node["union_type"] = union_type
+                child_node["union_type"] = frame["union_type"]
 
                 # Detect non-biological parents
-                # Convert IDs to string for safe comparison
-                df_child = df[df["ID"].astype(str).str.replace("'", "") == str(cid)]
-                if not df_child.empty:
-                    row = df_child.iloc[0]
-                    non_bio_father = pd.notna(
-                        row.get("ID_pere_original")
-                    ) and "'" in str(row["ID_pere_original"])
-                    non_bio_mother = pd.notna(
-                        row.get("ID_mere_original")
-                    ) and "'" in str(row["ID_mere_original"])
-                    child_node["non_bio_father"] = non_bio_father
-                    child_node["non_bio_mother"] = non_bio_mother
-                else:
-                    child_node["non_bio_father"] = False
-                    child_node["non_bio_mother"] = False
-
-                children_nodes.append(child_node)
-
-        # Offset for multiple unions (for visualization)
-        offset = (i - (len(unions) - 1) / 2) * base_delta
-        spouse_id = union.get("spouse_id")
-
-        # Build spouse/union node
-        if spouse_id and spouse_id in people:
-            sp = people[spouse_id]
-            union_node = {
-                "id": f"{pid}_{union['union_id']}",
-                "name": sp["name"],
-                "birth": sp["birth"],
-                "death": sp["death"],
-                "gen": sp["gen"],
-                "gen_origin": sp["gen_origin"],
-                "children": children_nodes,
-                "isSpouse": True,
-                "union_type": union_type,
-                "xOffset": offset,
-            }
-        else:
-            # Single parent union (no spouse)
-            union_node = {
-                "id": f"{pid}_{union['union_id']}",
-                "name": "",
-                "children": children_nodes,
-                "isSpouse": True,
-                "isSingleParent": True,
-                "union_type": union_type,
-                "xOffset": offset,
-            }
+                non_bio_father, non_bio_mother = non_bio_parents.get(
+                    cid, (False, False)
+                )
+                child_node["non_bio_father"] = non_bio_father
+                child_node["non_bio_mother"] = non_bio_mother
+
+                frame["built"].append(child_node)
+                stack.append(new_frame(cid, child_node))
+            continue
+
+        # --- Current union exhausted: attach it and move to the next ---
+        unions = frame["unions"]
+        if frame["index"] >= 0:
+            i = frame["index"]
+            # Offset for multiple unions (for visualization)
+            offset = (i - (len(unions) - 1) / 2) * base_delta
+            frame["node"]["children"].append(
+                make_union_node(
+                    frame["pid"],
+                    unions[i],
+                    frame["union_type"],
+                    offset,
+                    frame["built"],
+                )
+            )
 
-        node["children"].append(union_node)
+        frame["index"] += 1
+        if frame["index"] < len(unions):
+            union = unions[frame["index"]]
+            frame["union_type"] = union["union_type"]
+            frame["pending"] = iter(union["children"])
+            frame["built"] = []
+        else:
+            stack.pop()
 
-    return node
+    return root
 
 
 # -----------------------------
@@ -256,8 +403,11 @@ root_tree = trees[0] if trees else {"name": "Family Tree", "children": []}
 # -----------------------------
 # Export JSON
 # -----------------------------
+# Serialized once, reused for the HTML payload below
+payload = to_json(root_tree)
+
 with open("family_tree_with_unions.json", "w", encoding="utf-8") as f:
-    json.dump(root_tree, f, ensure_ascii=False, indent=2)
+    f.write(payload)
 
 # -----------------------------
 # Generate HTML
@@ -265,12 +415,13 @@ with open("family_tree_with_unions.json", "w", encoding="utf-8") as f:
 with open("template.html", "r", encoding="utf-8") as f:
     html_template = f.read()
 
-html_output = html_template.replace(
-    "__DATA__", json.dumps(root_tree, ensure_ascii=False).replace("`", "\\`")
-)
+# Write the page around the data instead of building one large string
+html_head, html_tail = html_template.split("__DATA__", 1)
 
 with open("family_tree_with_unions.html", "w", encoding="utf-8") as f:
-    f.write(html_output)
+    f.write(html_head)
+    f.write(payload.replace("`", "\\`"))
+    f.write(html_tail)
 
 
 html_path = os.path.abspath("family_tree_with_unions.html")
@@ -280,5 +431,5 @@ print(f"✓ HTML generated correctly:\n{html_path}")
 webbrowser.open(f"file://{html_path}")
 
 subprocess.run(["python", "Timeline.py"], check=True)
-timeline_path = os.path.abspath("family_timeline.png")
+timeline_path = os.path.abspath("family_timeline.html")
 subprocess.run(["python", "linear_calendar.py"], check=True)